@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
 
+import sys
 import logging
-from mqlib_installation_utils import ensure_mqlib
+from mqlib_installation_utils import ensure_mqlib, DEFAULT_VARIANT
 
 logging.basicConfig(level=logging.INFO)
 
 
 def main():
-    ensure_mqlib()
+    ensure_mqlib(sys.argv[1:] or [DEFAULT_VARIANT])
 
 if __name__ == "__main__":
     main()
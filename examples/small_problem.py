@@ -35,7 +35,19 @@ config = {
     "runtime_limit" : 1, # ------------> runtime limit in seconds for every heuristic, it is optional
                          #               default value is 10
 
-    "seed" : 42 # ---------------------> random seed, it is optional, default value is 42
+    "seed" : 42, # --------------------> random seed, it is optional, default value is 42
+
+    "relabel" : "none", # -------------> `relabel` specifies how node ids are mapped to MQLib variables,
+                        #                if it is equal `none` ids are used as is and the problem size is
+                        #                max(node_id) + 1, `compact` maps ids to a dense range dropping
+                        #                ids that appear neither in `edges` nor in `nodes`, `rcm` does the
+                        #                same and reorders nodes by reverse Cuthill-McKee to improve locality.
+                        #                With `compact` and `rcm` returned configurations are dicts keyed by
+                        #                original node ids. This field is optional, default value is `none`
+
+    # "variant" : "native", # ---------> `variant` specifies MQLib build variant being run (see `./ensure_mqlib.py`),
+                            #            it is optional, if it is missed the `MQLIB_VARIANT` environment
+                            #            variable is used, if the latter is missed the value is `default`
 }
 
 print(run_heuristics(config))
@@ -1,25 +1,72 @@
+import os
 import sys
+import random
+import hashlib
 import logging
+import platform
 import subprocess
 import shutil
+import importlib.util
 from tempfile import TemporaryDirectory
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
-MQLIB_PATH = Path.home() / ".mqlib_bin"
-MQLIB_EXEC_PATH = MQLIB_PATH / "MQLib"
+MQLIB_CONFIG_PATH = Path(__file__).resolve().parent / "src" / "mqlib_wrap" / "config.py"
+
+
+def load_mqlib_config():
+    spec = importlib.util.spec_from_file_location("_mqlib_wrap_config", MQLIB_CONFIG_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# The executables layout is defined in `mqlib_wrap.config`, it is loaded from the source tree
+# since the executable is installed before the package
+mqlib_config = load_mqlib_config()
+
 REPO_URL = "https://github.com/LuchnikovI/MQLib"
+REPO_BRANCH = "master"
+COMPILER = "g++"
+
+DEFAULT_VARIANT = mqlib_config.DEFAULT_VARIANT
+
+# Extra compiler flags per build variant, they are added to the compiler command (the upstream
+# Makefile calls the compiler via `CPP`) so they reach both compile and link lines,
+# the `default` variant is built with plain `make`
+BUILD_VARIANTS = {
+    "default": [],
+    "native": ["-O3", "-march=native"],
+    "lto": ["-O3", "-march=native", "-flto=auto"],
+    "pgo": ["-O3", "-march=native"],
+}
 
+PGO_VARIANTS = {"pgo"}
 
-def uninstall_mqlib():
-    if MQLIB_PATH.exists():
-        shutil.rmtree(MQLIB_PATH)
+# PGO training parameters, the profile is collected by running every heuristic the same way
+# the wrapper does on randomly generated QUBO instances
+PGO_TRAINING_INSTANCES = [(200, 0.05), (1000, 0.01)]
+PGO_TRAINING_RUNTIME_LIMIT = 1
+PGO_TRAINING_SEED = 42
+
+
+def uninstall_mqlib(keep_builds: bool = False):
+    if keep_builds and mqlib_config.MQLIB_BIN_PATH.exists():
+        for path in mqlib_config.MQLIB_BIN_PATH.iterdir():
+            if path == mqlib_config.MQLIB_BUILDS_PATH:
+                continue
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+    elif mqlib_config.MQLIB_BIN_PATH.exists():
+        shutil.rmtree(mqlib_config.MQLIB_BIN_PATH)
     logger.info("MQLib executable has been uninstalled")
 
 
 def create_mqlib_dir():
-    MQLIB_PATH.mkdir(parents=True, exist_ok=True)
+    mqlib_config.MQLIB_BIN_PATH.mkdir(parents=True, exist_ok=True)
 
 
 def check_tool_exists(tool: str):
@@ -27,37 +74,204 @@ def check_tool_exists(tool: str):
         raise RuntimeError(f"{tool} is not installed or not in PATH")
 
 
-def install_mqlib():
+def check_variant(variant: str):
+    if variant not in BUILD_VARIANTS:
+        raise ValueError(f"{variant} is unknown build variant, it must be from the following set {set(BUILD_VARIANTS)}")
+
+
+def get_source_revision() -> str:
+    result = subprocess.run(
+        ["git", "ls-remote", REPO_URL, f"refs/heads/{REPO_BRANCH}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    if not result.stdout.strip():
+        raise RuntimeError(f"Branch {REPO_BRANCH} is not found in {REPO_URL}")
+    return result.stdout.split()[0]
+
+
+def probe_compiler(args):
+    try:
+        result = subprocess.run([COMPILER, *args], check=True, capture_output=True, text=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def get_compiler_version() -> str:
+    version = probe_compiler(["-dumpfullversion"])
+    if version is None:
+        version = probe_compiler(["--version"])
+    return version or ""
+
+
+def get_host_target(variant: str) -> str:
+    if "-march=native" not in BUILD_VARIANTS[variant]:
+        return ""
+    # `-Q --help=target` is GCC specific, other compilers fall back to the host name
+    # so that a build for one CPU is never reused on another machine
+    return probe_compiler(["-march=native", "-Q", "--help=target"]) or platform.node()
+
+
+def get_build_key(revision: str, variant: str, compiler_version: str, host_target: str) -> str:
+    flags = " ".join(BUILD_VARIANTS[variant])
+    pgo = "pgo" if variant in PGO_VARIANTS else "nopgo"
+    digest = hashlib.sha256(
+        f"{revision}\n{flags}\n{pgo}\n{compiler_version}\n{host_target}".encode("utf-8")
+    ).hexdigest()
+    return f"{revision[:12]}-{digest[:12]}"
+
+
+def get_build_exec_path(build_key: str) -> Path:
+    return mqlib_config.MQLIB_BUILDS_PATH / build_key / "MQLib"
+
+
+def get_installed_build_key(variant: str):
+    exec_path = mqlib_config.get_mqlib_path(variant)
+    if not exec_path.is_symlink() or not exec_path.exists():
+        return None
+    return Path(os.readlink(exec_path)).parent.name
+
+
+def fetch_source(build_path: Path, revision: str):
+    subprocess.run(["git", "init", "-q"], cwd=build_path, check=True)
+    subprocess.run(["git", "fetch", "-q", "--depth", "1", REPO_URL, revision], cwd=build_path, check=True)
+    subprocess.run(["git", "checkout", "-q", "FETCH_HEAD"], cwd=build_path, check=True)
+
+
+def clean_source(build_path: Path):
+    subprocess.run(["git", "clean", "-q", "-x", "-f", "-d"], cwd=build_path, check=True)
+
+
+def run_make(build_path: Path, flags):
+    cmd_args = ["make", f"-j{os.cpu_count() or 1}"]
+    if flags:
+        compiler = " ".join([COMPILER, *flags])
+        cmd_args += [f"CPP={compiler}", f"CXX={compiler}"]
+    subprocess.run(cmd_args, cwd=build_path, check=True)
+
+
+def write_training_instance(path: Path, nodes_number: int, density: float, rng: random.Random):
+    entries = [(node_id, node_id, rng.uniform(-1., 1.)) for node_id in range(1, nodes_number + 1)]
+    entries += [
+        (lhs_id, rhs_id, rng.uniform(-1., 1.))
+        for lhs_id in range(1, nodes_number + 1)
+        for rhs_id in range(lhs_id + 1, nodes_number + 1)
+        if rng.random() < density
+    ]
+    with open(path, "w") as f:
+        f.write(f"{nodes_number} {len(entries)}\n")
+        for lhs_id, rhs_id, ampl in entries:
+            f.write(f"{lhs_id} {rhs_id} {ampl}\n")
+
+
+def train_pgo_profile(build_path: Path):
+    rng = random.Random(PGO_TRAINING_SEED)
+    for instance_id, (nodes_number, density) in enumerate(PGO_TRAINING_INSTANCES):
+        instance_path = build_path / f"pgo_training_{instance_id}.txt"
+        write_training_instance(instance_path, nodes_number, density, rng)
+        for heuristic in sorted(mqlib_config.HEURISTICS):
+            logger.info(f"Collecting PGO profile with {heuristic} heuristic on {nodes_number} nodes instance")
+            result = subprocess.run(
+                [str(build_path / "bin" / "MQLib"), "-fQ", str(instance_path), "-h", heuristic,
+                 "-r", str(PGO_TRAINING_RUNTIME_LIMIT), "-s", str(PGO_TRAINING_SEED), "-ps"],
+                cwd=build_path,
+                capture_output=True,
+            )
+            if result.returncode != 0:
+                logger.warning(f"{heuristic} heuristic exited with code {result.returncode} during PGO training: {result.stderr}")
+
+
+def remove_build_artifacts(build_path: Path):
+    for object_path in build_path.rglob("*.o"):
+        object_path.unlink()
+    (build_path / "bin" / "MQLib").unlink()
+
+
+def build_mqlib(build_path: Path, variant: str):
+    flags = BUILD_VARIANTS[variant]
+    if variant in PGO_VARIANTS:
+        run_make(build_path, flags + ["-fprofile-generate", "-fprofile-update=atomic"])
+        train_pgo_profile(build_path)
+        remove_build_artifacts(build_path)
+        run_make(build_path, flags + ["-fprofile-use", "-fprofile-correction"])
+    else:
+        run_make(build_path, flags)
+
+
+def cache_build(build_path: Path, build_key: str):
+    build_exec_path = get_build_exec_path(build_key)
+    build_exec_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = build_exec_path.with_name(build_exec_path.name + ".tmp")
+    try:
+        shutil.copy2(build_path / "bin" / "MQLib", tmp_path)
+        tmp_path.chmod(
+            tmp_path.stat().st_mode | 0o111
+        )
+        os.replace(tmp_path, build_exec_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def link_build(build_key: str, variant: str):
+    exec_path = mqlib_config.get_mqlib_path(variant)
+    exec_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = exec_path.with_name(exec_path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+    tmp_path.symlink_to(get_build_exec_path(build_key))
+    os.replace(tmp_path, exec_path)
+
+
+def get_build_keys(variants, revision: str) -> dict:
+    compiler_version = get_compiler_version()
+    return {
+        variant: get_build_key(revision, variant, compiler_version, get_host_target(variant))
+        for variant in variants
+    }
+
+
+def install_mqlib(build_keys: dict, revision: str):
     create_mqlib_dir()
-    with TemporaryDirectory() as build:
+    missing_variants = [variant for variant, build_key in build_keys.items() if not get_build_exec_path(build_key).exists()]
+    if missing_variants:
         check_tool_exists("git")
         check_tool_exists("make")
-        build_path = Path(build)
-        subprocess.run(
-            ["git", "clone", "--depth", "1", "--branch", "master", REPO_URL, str(build_path)],
-            check=True,
-        )
-        subprocess.run(
-            ["make"],
-            cwd=build_path,
-            check=True,
-        )
-        shutil.copy2(build_path / "bin" / "MQLib", MQLIB_EXEC_PATH)
-        MQLIB_EXEC_PATH.chmod(
-            MQLIB_EXEC_PATH.stat().st_mode | 0o111
-        )
-        logger.info("MQLib executable has been installed")
-
+        with TemporaryDirectory() as build:
+            build_path = Path(build)
+            fetch_source(build_path, revision)
+            for variant in missing_variants:
+                clean_source(build_path)
+                build_mqlib(build_path, variant)
+                cache_build(build_path, build_keys[variant])
+                logger.info(f"MQLib build {build_keys[variant]} has been cached for {variant} variant")
+    for variant, build_key in build_keys.items():
+        link_build(build_key, variant)
+        logger.info(f"MQLib executable has been installed for {variant} variant")
 
-def ensure_mqlib():
-    if MQLIB_EXEC_PATH.exists():
-        logger.info("MQLib executable is found")
-    else:
-        logger.info(f"MQLib executable has not been found, it will be instaled in {MQLIB_PATH}")
-        try:
-            install_mqlib()
-        except BaseException:
-            logger.exception(f"MQLib instalation failed, {MQLIB_PATH} will be uninstalled")
-            uninstall_mqlib()
-            sys.exit(1)
 
+def ensure_mqlib(variants=(DEFAULT_VARIANT,)):
+    variants = list(dict.fromkeys(variants))
+    for variant in variants:
+        check_variant(variant)
+    try:
+        revision = get_source_revision()
+    except (OSError, RuntimeError, subprocess.CalledProcessError):
+        if all(mqlib_config.get_mqlib_path(variant).exists() for variant in variants):
+            logger.warning("MQLib revision can not be resolved, installed executables are kept")
+            return
+        logger.exception("MQLib revision can not be resolved")
+        sys.exit(1)
+    build_keys = get_build_keys(variants, revision)
+    outdated_keys = {variant: build_key for variant, build_key in build_keys.items() if get_installed_build_key(variant) != build_key}
+    for variant in variants:
+        if variant not in outdated_keys:
+            logger.info(f"MQLib executable is up to date for {variant} variant")
+    if not outdated_keys:
+        return
+    logger.info(f"MQLib executables for {list(outdated_keys)} variants will be installed in {mqlib_config.MQLIB_BIN_PATH}")
+    try:
+        install_mqlib(outdated_keys, revision)
+    except BaseException:
+        logger.exception("MQLib instalation failed, previously installed executables are kept")
+        sys.exit(1)
@@ -1,4 +1,6 @@
+import os
 import logging
+from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +56,21 @@ DEFAULT_RUNTIME_LIMIT = 10
 DEFAULT_HARD_RUNTIME_LIMIT = 7 * 24 * 3600 # one week in seconds
 DEFAULT_SEED = 42
 DEFAULT_DEFAULT_FIELD = 0.
+DEFAULT_RELABEL = "none"
+DEFAULT_VARIANT = "default"
+VARIANT_ENV_VAR = "MQLIB_VARIANT"
+
+# Layout of installed MQLib executables, shared with `mqlib_installation_utils.py`
+MQLIB_BIN_PATH = Path.home() / ".mqlib_bin"
+MQLIB_EXEC_PATH = MQLIB_BIN_PATH / "MQLib"
+MQLIB_BUILDS_PATH = MQLIB_BIN_PATH / "builds"
+MQLIB_VARIANTS_PATH = MQLIB_BIN_PATH / "variants"
+
+RELABELINGS = {
+    "none", # node ids are used as is, the problem size is `max(node_id) + 1`
+    "compact", # node ids are compacted to a dense range preserving their order
+    "rcm", # node ids are compacted and reordered by reverse Cuthill-McKee
+}
 
 
 def get_or_default_and_warn(config, key, default_value):
@@ -120,6 +137,35 @@ def analyse_and_desug_hard_runtime_limit(hard_runtime_limit):
     return hard_runtime_limit
 
 
+def analyse_and_desug_relabel(relabel):
+    if not isinstance(relabel, str):
+        raise TypeError(f"`relabel` must be a string, got {relabel} of type {type(relabel)}")
+    if relabel not in RELABELINGS:
+        raise ValueError(f"{relabel} is unknown relabeling, it must be from the following set {RELABELINGS}")
+    return relabel
+
+
+def get_variant(config):
+    variant = config.get("variant")
+    if variant is None:
+        return os.environ.get(VARIANT_ENV_VAR, DEFAULT_VARIANT)
+    return variant
+
+
+def get_mqlib_path(variant):
+    if variant == DEFAULT_VARIANT:
+        return MQLIB_EXEC_PATH
+    return MQLIB_VARIANTS_PATH / variant / "MQLib"
+
+
+def analyse_and_desug_variant(variant):
+    if not isinstance(variant, str):
+        raise TypeError(f"`variant` must be a string, got {variant} of type {type(variant)}")
+    if not variant or not all(c.isalnum() or c in "_-" for c in variant):
+        raise ValueError(f"Invalid `variant` {variant}, must be a non-empty name of an installed MQLib build variant")
+    return variant
+
+
 def check_node(node):
     if not isinstance(node, (tuple, list)) \
        or len(node) != 2 \
@@ -203,6 +249,56 @@ def make_graph(nodes_number, edges):
     return graph
 
 
+def get_compact_node_ids(edges, nodes):
+    node_ids = set(nodes.keys())
+    for lhs_id, rhs_id in edges.keys():
+        node_ids.add(lhs_id)
+        node_ids.add(rhs_id)
+    return sorted(node_ids)
+
+
+def get_rcm_order(graph):
+    nodes_number = len(graph)
+    degrees = [len(neighbors) for neighbors in graph]
+    visited = [False] * nodes_number
+    order = []
+    for start in sorted(range(nodes_number), key=lambda node_id: degrees[node_id]):
+        if visited[start]:
+            continue
+        visited[start] = True
+        component_begin = len(order)
+        order.append(start)
+        while component_begin < len(order):
+            node_id = order[component_begin]
+            component_begin += 1
+            for other_id in sorted(graph[node_id], key=lambda other_id: degrees[other_id]):
+                if not visited[other_id]:
+                    visited[other_id] = True
+                    order.append(other_id)
+    order.reverse()
+    return order
+
+
+def relabel_edges_and_nodes(edges, nodes, node_ids):
+    new_ids = {node_id : new_id for new_id, node_id in enumerate(node_ids)}
+    relabeled_edges = {}
+    for (lhs_id, rhs_id), ampl in edges.items():
+        new_lhs_id, new_rhs_id = new_ids[lhs_id], new_ids[rhs_id]
+        relabeled_edges[(min(new_lhs_id, new_rhs_id), max(new_lhs_id, new_rhs_id))] = ampl
+    relabeled_nodes = {new_ids[node_id] : ampl for node_id, ampl in nodes.items()}
+    return relabeled_edges, relabeled_nodes
+
+
+def get_node_ids(edges, nodes, relabel):
+    if relabel == "none":
+        return None
+    node_ids = get_compact_node_ids(edges, nodes)
+    if relabel == "rcm":
+        compact_edges, _ = relabel_edges_and_nodes(edges, {}, node_ids)
+        node_ids = [node_ids[new_id] for new_id in get_rcm_order(make_graph(len(node_ids), compact_edges))]
+    return node_ids
+
+
 def analyse_and_desug_config(config):
     if not isinstance(config, dict):
         raise TypeError(f"Input config must be a dictionary, but its actual type is {type(config)}")
@@ -212,10 +308,14 @@ def analyse_and_desug_config(config):
     default_field = analyse_and_desug_default_field(get_or_default_and_warn(config, "default_field", DEFAULT_DEFAULT_FIELD))
     edges = analyse_and_desug_edges(raw_edges)
     _nodes = analyse_and_desug_nodes(get_or_default_and_warn(config, "nodes", DEFAULT_NODES))
+    relabel = analyse_and_desug_relabel(get_or_default_and_warn(config, "relabel", DEFAULT_RELABEL))
     heuristics = analyse_and_desug_heuristics(get_or_default_and_warn(config, "heuristics", DEFAULT_HEURISTICS))
     runtime_limit = analyse_and_desug_runtime_limit(get_or_default_and_warn(config, "runtime_limit", DEFAULT_RUNTIME_LIMIT))
     hard_runtime_limit = analyse_and_desug_hard_runtime_limit(get_or_default_and_warn(config, "hard_runtime_limit", DEFAULT_HARD_RUNTIME_LIMIT))
     seed = analyse_and_desug_seed(get_or_default_and_warn(config, "seed", DEFAULT_SEED))
+    node_ids = get_node_ids(edges, _nodes, relabel)
+    if node_ids is not None:
+        edges, _nodes = relabel_edges_and_nodes(edges, _nodes, node_ids)
     nodes_number = get_nodes_number(edges, _nodes)
     nodes = {node_id : _nodes.get(node_id, default_field) for node_id in range(nodes_number)}
     qubo_shift = sum(edges.values()) - sum(nodes.values())
@@ -226,6 +326,7 @@ def analyse_and_desug_config(config):
         "nodes" : nodes,
         "edges" : edges,
         "graph" : graph,
+        "node_ids" : node_ids,
         "qubo_shift" : qubo_shift,
         "heuristics" : heuristics,
         "runtime_limit" : runtime_limit,
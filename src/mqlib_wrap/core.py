@@ -1,16 +1,30 @@
 from functools import reduce
 import logging
 import tempfile
-from pathlib import Path
 from subprocess import TimeoutExpired, run
 
-from mqlib_wrap.config import analyse_and_desug_config, gen_problem_string
+from mqlib_wrap.config import (
+    MQLIB_EXEC_PATH,
+    analyse_and_desug_config,
+    analyse_and_desug_variant,
+    gen_problem_string,
+    get_mqlib_path,
+    get_variant,
+)
 
 logger = logging.getLogger(__name__)
 
-MQLIB_PATH = Path.home() / ".mqlib_bin" / "MQLib"
+MQLIB_PATH = MQLIB_EXEC_PATH
 
-def _run_heuristic(config, heuristic):
+
+def get_installed_mqlib_path(variant):
+    mqlib_path = get_mqlib_path(variant)
+    if not mqlib_path.exists():
+        raise FileNotFoundError(f"MQLib executable for {variant} variant is not found at {mqlib_path}, install it with `./ensure_mqlib.py {variant}`")
+    return mqlib_path
+
+
+def _run_heuristic(config, heuristic, mqlib_path):
     problem_string = gen_problem_string(config)
     runtime_limit = str(config["runtime_limit"])
     hard_runtime_limit = config["hard_runtime_limit"]
@@ -19,7 +33,7 @@ def _run_heuristic(config, heuristic):
         f.write(bytes(problem_string, "utf-8"))
         f.flush()
         problem_path = f.name
-        cmd_args = [MQLIB_PATH, "-fQ", problem_path, "-h", heuristic, "-r", runtime_limit, "-s", seed, "-ps"]
+        cmd_args = [mqlib_path, "-fQ", problem_path, "-h", heuristic, "-r", runtime_limit, "-s", seed, "-ps"]
         try:
             result = run(cmd_args, capture_output=True, timeout=hard_runtime_limit)
         except TimeoutExpired as _:
@@ -30,15 +44,18 @@ def _run_heuristic(config, heuristic):
         lines = result.stdout.split(sep=b"\n")
         energy = -float(lines[0].split(sep=b",")[3]) + config["qubo_shift"]
         configuration = list(map(lambda x: 2 * int(x) - 1, lines[-2].split(b" ")))
+        node_ids = config["node_ids"]
+        if node_ids is not None:
+            configuration = {node_id : var for node_id, var in zip(node_ids, configuration)}
         return {"energy" : energy, "configuration" : configuration}
 
 
-def _run_heuristics(config):
+def _run_heuristics(config, mqlib_path):
     heuristics = config["heuristics"]
     results = {}
     for heuristic in heuristics:
         logger.debug(f"Running {heuristic} heuristic")
-        result = _run_heuristic(config, heuristic)
+        result = _run_heuristic(config, heuristic, mqlib_path)
         logger.debug(f"Heuristic {heuristic} finished, best energy {result['energy']}")
         results[heuristic] = result
     return results
@@ -46,7 +63,8 @@ def _run_heuristics(config):
 
 def run_heuristics(config):
     analysed_config = analyse_and_desug_config(config)
-    return _run_heuristics(analysed_config)
+    mqlib_path = get_installed_mqlib_path(analyse_and_desug_variant(get_variant(config)))
+    return _run_heuristics(analysed_config, mqlib_path)
 
 
 def get_energy_function(config):
@@ -54,8 +72,13 @@ def get_energy_function(config):
     nodes_number = analysed_config["nodes_number"]
     edges = analysed_config["edges"]
     nodes = analysed_config["nodes"]
+    node_ids = analysed_config["node_ids"]
 
     def energy_function(configuration):
+        if node_ids is not None:
+            if not isinstance(configuration, dict) or set(configuration.keys()) != set(node_ids):
+                raise ValueError(f"Invalid configuration {configuration}, must be a dict with node ids {node_ids} as keys")
+            configuration = [configuration[node_id] for node_id in node_ids]
         if isinstance(configuration, (list, tuple)) and len(configuration) == nodes_number:
             for var in configuration:
                 if var != 1 and var != -1:
@@ -7,7 +7,12 @@ from mqlib_wrap.config import (
     gen_problem_string,
     DEFAULT_RUNTIME_LIMIT,
     DEFAULT_SEED,
+    DEFAULT_VARIANT,
+    VARIANT_ENV_VAR,
+    analyse_and_desug_variant,
+    get_variant,
 )
+from mqlib_wrap.core import get_energy_function
 
 # ============================================================
 # analyse_and_desug_config — BASIC VALID CASES
@@ -169,3 +174,92 @@ def test_problem_string_uses_all_nodes():
     # must contain 4 diagonal terms
     diag_lines = [l for l in lines[1:] if l.split()[0] == l.split()[1]]
     assert len(diag_lines) == 4
+
+
+# ============================================================
+# analyse_and_desug_config — RELABELING
+# ============================================================
+
+def test_config_relabel_none_by_default():
+    out = analyse_and_desug_config({
+        "edges": [((3, 1), -2.0)]
+    })
+
+    assert out["node_ids"] is None
+    assert out["nodes_number"] == 4
+
+
+def test_config_relabel_compact():
+    out = analyse_and_desug_config({
+        "edges": [((1000, 10), 1.0), ((10, 500000), -2.0)],
+        "nodes": {7: 0.5},
+        "default_field": -1.0,
+        "relabel": "compact",
+    })
+
+    assert out["node_ids"] == [7, 10, 1000, 500000]
+    assert out["nodes_number"] == 4
+    assert out["nodes"] == {0: 0.5, 1: -1.0, 2: -1.0, 3: -1.0}
+    assert out["edges"] == {(1, 2): 1.0, (1, 3): -2.0}
+    assert out["graph"] == [[], [2, 3], [1], [1]]
+
+
+def test_config_relabel_rcm_is_permutation_with_small_bandwidth():
+    # a path 0 - 5 - 1 - 4 - 2 - 3 labeled to have a large bandwidth
+    path = [0, 5, 1, 4, 2, 3]
+    cfg = {
+        "edges": [((lhs, rhs), 1.0) for lhs, rhs in zip(path, path[1:])],
+        "relabel": "rcm",
+    }
+
+    out = analyse_and_desug_config(cfg)
+
+    assert sorted(out["node_ids"]) == list(range(6))
+    assert out["nodes_number"] == 6
+    assert len(out["edges"]) == 5
+    assert max(rhs - lhs for lhs, rhs in out["edges"]) == 1
+
+
+def test_config_invalid_relabel():
+    with pytest.raises(ValueError):
+        analyse_and_desug_config({"edges": [((0, 1), 1.0)], "relabel": "unknown"})
+    with pytest.raises(TypeError):
+        analyse_and_desug_config({"edges": [((0, 1), 1.0)], "relabel": 1})
+
+
+def test_energy_function_relabeled_configuration():
+    cfg = {
+        "edges": [((10, 1000), 2.0)],
+        "nodes": {10: 1.0},
+        "relabel": "rcm",
+    }
+
+    energy_function = get_energy_function(cfg)
+
+    assert energy_function({10: 1, 1000: -1}) == -1.0
+    with pytest.raises(ValueError):
+        energy_function([1, -1])
+
+
+# ============================================================
+# get_variant, analyse_and_desug_variant — MQLIB BUILD VARIANT
+# ============================================================
+
+def test_variant_default(monkeypatch):
+    monkeypatch.delenv(VARIANT_ENV_VAR, raising=False)
+
+    assert get_variant({"edges": [((0, 1), 1.0)]}) == DEFAULT_VARIANT
+
+
+def test_variant_env_and_override(monkeypatch):
+    monkeypatch.setenv(VARIANT_ENV_VAR, "native")
+
+    assert get_variant({"edges": [((0, 1), 1.0)]}) == "native"
+    assert get_variant({"edges": [((0, 1), 1.0)], "variant": "pgo"}) == "pgo"
+
+
+def test_invalid_variant():
+    with pytest.raises(ValueError):
+        analyse_and_desug_variant("../native")
+    with pytest.raises(TypeError):
+        analyse_and_desug_variant(1)
@@ -0,0 +1,43 @@
+import pytest
+
+import mqlib_installation_utils
+from mqlib_wrap import config
+from mqlib_wrap.core import get_energy_function, get_mqlib_path, run_heuristics
+
+
+# ============================================================
+# MQLib executables layout
+# ============================================================
+
+def test_core_finds_installer_builds(monkeypatch, tmp_path):
+    for module in (config, mqlib_installation_utils.mqlib_config):
+        monkeypatch.setattr(module, "MQLIB_EXEC_PATH", tmp_path / "MQLib")
+        monkeypatch.setattr(module, "MQLIB_BUILDS_PATH", tmp_path / "builds")
+        monkeypatch.setattr(module, "MQLIB_VARIANTS_PATH", tmp_path / "variants")
+
+    for variant in mqlib_installation_utils.BUILD_VARIANTS:
+        build_exec_path = mqlib_installation_utils.get_build_exec_path(f"key-{variant}")
+        build_exec_path.parent.mkdir(parents=True)
+        build_exec_path.touch()
+        mqlib_installation_utils.link_build(f"key-{variant}", variant)
+
+        assert get_mqlib_path(variant).resolve() == build_exec_path.resolve()
+
+
+# ============================================================
+# run_heuristics / get_energy_function — VARIANT SELECTION
+# ============================================================
+
+def test_run_heuristics_missing_variant(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "MQLIB_VARIANTS_PATH", tmp_path)
+
+    with pytest.raises(FileNotFoundError, match="ensure_mqlib.py native"):
+        run_heuristics({"edges": [((0, 1), 1.0)], "variant": "native"})
+
+
+def test_energy_function_ignores_variant(monkeypatch):
+    monkeypatch.setenv(config.VARIANT_ENV_VAR, "../invalid")
+
+    energy_function = get_energy_function({"edges": [((0, 1), 1.0)]})
+
+    assert energy_function([1, -1]) == -1.0
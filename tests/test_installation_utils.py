@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+import mqlib_installation_utils
+from mqlib_installation_utils import (
+    BUILD_VARIANTS,
+    check_variant,
+    get_build_exec_path,
+    get_build_key,
+    get_host_target,
+    get_installed_build_key,
+    link_build,
+    mqlib_config,
+    write_training_instance,
+)
+
+REVISION = "0123456789abcdef0123456789abcdef01234567"
+OTHER_REVISION = "fedcba9876543210fedcba9876543210fedcba98"
+
+
+@pytest.fixture
+def mqlib_bin_path(monkeypatch, tmp_path):
+    monkeypatch.setattr(mqlib_config, "MQLIB_EXEC_PATH", tmp_path / "MQLib")
+    monkeypatch.setattr(mqlib_config, "MQLIB_BUILDS_PATH", tmp_path / "builds")
+    monkeypatch.setattr(mqlib_config, "MQLIB_VARIANTS_PATH", tmp_path / "variants")
+    return tmp_path
+
+
+# ============================================================
+# variants
+# ============================================================
+
+def test_check_variant():
+    for variant in BUILD_VARIANTS:
+        check_variant(variant)
+    with pytest.raises(ValueError):
+        check_variant("unknown")
+
+
+# ============================================================
+# build cache key
+# ============================================================
+
+def test_build_key_is_deterministic():
+    for variant in BUILD_VARIANTS:
+        assert get_build_key(REVISION, variant, "12.2.0", "target") == get_build_key(REVISION, variant, "12.2.0", "target")
+
+
+def test_build_key_depends_on_variant():
+    keys = {get_build_key(REVISION, variant, "12.2.0", "target") for variant in BUILD_VARIANTS}
+
+    assert len(keys) == len(BUILD_VARIANTS)
+
+
+def test_build_key_depends_on_revision_compiler_and_host():
+    key = get_build_key(REVISION, "native", "12.2.0", "target")
+
+    assert key.startswith(REVISION[:12])
+    assert get_build_key(OTHER_REVISION, "native", "12.2.0", "target") != key
+    assert get_build_key(REVISION, "native", "13.1.0", "target") != key
+    assert get_build_key(REVISION, "native", "12.2.0", "other target") != key
+
+
+def test_host_target_only_for_native_variants(monkeypatch):
+    monkeypatch.setattr(mqlib_installation_utils, "COMPILER", "no-such-compiler")
+
+    assert get_host_target("default") == ""
+    assert get_host_target("native") != ""
+
+
+# ============================================================
+# installed builds
+# ============================================================
+
+def test_installed_build_key(mqlib_bin_path):
+    assert get_installed_build_key("native") is None
+
+    get_build_exec_path("key").parent.mkdir(parents=True)
+    get_build_exec_path("key").touch()
+    link_build("key", "native")
+
+    assert get_installed_build_key("native") == "key"
+    assert get_installed_build_key("default") is None
+
+
+def test_relink_replaces_previous_build(mqlib_bin_path):
+    for build_key in ("old", "new"):
+        get_build_exec_path(build_key).parent.mkdir(parents=True)
+        get_build_exec_path(build_key).touch()
+        link_build(build_key, "default")
+
+    assert get_installed_build_key("default") == "new"
+    assert mqlib_config.get_mqlib_path("default").resolve() == get_build_exec_path("new").resolve()
+
+
+# ============================================================
+# PGO training instances
+# ============================================================
+
+def test_training_instance_is_qubo(tmp_path):
+    path = tmp_path / "instance.txt"
+    write_training_instance(path, 20, 0.2, random.Random(0))
+
+    lines = path.read_text().strip().splitlines()
+    nodes_number, entries_number = map(int, lines[0].split())
+
+    assert nodes_number == 20
+    assert len(lines) == entries_number + 1
+    diags = [l for l in lines[1:] if l.split()[0] == l.split()[1]]
+    assert len(diags) == 20
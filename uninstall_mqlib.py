@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import sys
 import logging
 from mqlib_installation_utils import uninstall_mqlib
 
@@ -7,7 +8,7 @@ logging.basicConfig(level=logging.INFO)
 
 
 def main():
-    uninstall_mqlib()
+    uninstall_mqlib(keep_builds="--keep-builds" in sys.argv[1:])
 
 if __name__ == "__main__":
     main()